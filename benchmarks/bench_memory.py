@@ -0,0 +1,89 @@
+"""
+Memory held by the frames the dashboard caches (load_data), read with default
+dtypes vs through the compact dtype layer (src.schema), at several portfolio sizes.
+
+Usage: python -m benchmarks.bench_memory [n_projects ...]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+
+import pandas as pd
+
+from src import schema
+from src.data_gen import generate_data
+from src.etl import load_all
+from src.metrics import build
+
+SCALES = [3, 30, 300]
+
+# Same reads as streamlit_app.load_data, plus the KPI frames the query cache
+# (src.metrics.query) holds once every project has been viewed at both grains
+APP_QUERIES = {
+    "cache:kpi_weekly": "SELECT * FROM kpi_weekly",
+    "cache:kpi_monthly": "SELECT * FROM kpi_monthly",
+    "health_flags": "SELECT * FROM health_flags",
+    "eac_forecast": "SELECT * FROM eac_forecast",
+    "schedule_weekly": "SELECT * FROM vw_schedule_weekly",
+    "schedule_monthly": "SELECT * FROM vw_schedule_monthly",
+    "wbs_monthly": "SELECT * FROM vw_wbs_performance_monthly",
+    "activities": "SELECT * FROM activities",
+    "changes": "SELECT * FROM changes",
+    "projects": "SELECT * FROM projects",
+}
+
+def build_portfolio(n_projects, workdir):
+    profiles = ["stable", "good", "deteriorating"]
+    config = [
+        {"id": f"P{i + 1:03d}", "name": f"Project {i + 1}", "client": f"Client {i % 10}",
+         "budget_factor": 1.0, "perf_profile": profiles[i % 3]}
+        for i in range(n_projects)
+    ]
+    original = generate_data.PROJECTS_CONFIG
+    generate_data.PROJECTS_CONFIG = config
+    try:
+        random.seed(0)
+        raw_dir = os.path.join(workdir, "raw")
+        db_path = os.path.join(workdir, "pc_intel.db")
+        generate_data.main(raw_dir)
+        load_all.init_db(db_path)
+        load_all.load_data(db_path, raw_dir)
+        build.build_metrics(db_path)
+    finally:
+        generate_data.PROJECTS_CONFIG = original
+    return db_path
+
+def measure(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = []
+    for name, query in APP_QUERIES.items():
+        df = pd.read_sql(query, conn)
+        rows.append((name, len(df), schema.memory_mb(df), schema.memory_mb(schema.compact(df))))
+    conn.close()
+    return rows
+
+def main(scales):
+    report = []
+    for n in scales:
+        with tempfile.TemporaryDirectory() as workdir:
+            db_path = build_portfolio(n, workdir)
+            for name, n_rows, before, after in measure(db_path):
+                report.append({"projects": n, "frame": name, "rows": n_rows,
+                               "before_mb": before, "after_mb": after})
+
+    df = pd.DataFrame(report)
+    totals = df.groupby("projects", as_index=False)[["rows", "before_mb", "after_mb"]].sum()
+    totals["frame"] = "TOTAL"
+    df = pd.concat([df, totals], ignore_index=True).sort_values(["projects"], kind="stable")
+    df["saved"] = 1 - df["after_mb"] / df["before_mb"]
+
+    pd.set_option("display.width", 1000)
+    print("\n--- Cached frame memory: default vs compact dtypes ---")
+    print(df.to_string(index=False, formatters={
+        "before_mb": "{:.3f}".format, "after_mb": "{:.3f}".format, "saved": "{:.0%}".format,
+    }))
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SCALES)
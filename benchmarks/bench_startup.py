@@ -0,0 +1,126 @@
+"""
+Cold-start latency of the entry points, each run end to end in a fresh
+interpreter under `python -X importtime`, against generated data in a
+temporary directory:
+
+- build_db:   `make build_db` (python -m src.etl.load_all: load + metrics build)
+- run_checks: `make run_checks` (python -m src.quality.run_checks)
+- app:        the dashboard's first render (Overview page) through streamlit's
+              AppTest. Without streamlit installed, the app module's own top-level
+              imports (read from its source) are timed instead.
+
+Reports the median wall time, the median time spent importing, and which
+heavy libraries were loaded, so a module-level import that slips back in
+shows up as a regression.
+
+Usage: python -m benchmarks.bench_startup [runs]
+"""
+import ast
+import importlib.util
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+APP = os.path.join(ROOT, "src", "app", "streamlit_app.py")
+RUNS = 3
+
+HEAVY = ["pandas", "numpy", "plotly", "streamlit"]
+
+# "import time: <self us> | <cumulative us> | <indent><module>"
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+def parse_importtime(stderr):
+    """
+    (total import seconds, set of imported top-level packages)
+    """
+    total = 0
+    packages = set()
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match is None:
+            continue
+        _, cumulative, indent, module = match.groups()
+        packages.add(module.split(".")[0])
+        # Top-level entries (no indent) already include their children
+        if not indent:
+            total += int(cumulative)
+    return total / 1e6, packages
+
+def app_imports():
+    """
+    The app's top-level import statements, taken from its source. Imports
+    of packages that aren't installed are dropped.
+    """
+    with open(APP) as f:
+        tree = ast.parse(f.read())
+    lines = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules = [node.module]
+        else:
+            continue
+        if all(importlib.util.find_spec(m.split(".")[0]) is not None for m in modules):
+            lines.append(ast.unparse(node))
+    return "; ".join(lines)
+
+def app_target(workdir):
+    if importlib.util.find_spec("streamlit") is not None:
+        code = ("from streamlit.testing.v1 import AppTest; "
+                f"at = AppTest.from_file({APP!r}, default_timeout=300).run(); "
+                "assert not at.exception, at.exception")
+        # The app's relative data paths resolve inside workdir
+        return "app", ["-c", code], workdir
+    return "app", ["-c", app_imports()], ROOT
+
+def targets(workdir):
+    db_path = os.path.join(workdir, "data", "processed", "pc_intel.db")
+    raw_dir = os.path.join(workdir, "data", "raw")
+    return [
+        # First, so the later targets have a built DB
+        ("build_db", ["-m", "src.etl.load_all", db_path, raw_dir], ROOT),
+        ("run_checks", ["-m", "src.quality.run_checks", db_path], ROOT),
+        app_target(workdir),
+    ]
+
+def prepare(workdir):
+    os.makedirs(os.path.join(workdir, "data", "processed"))
+    os.symlink(os.path.join(ROOT, "sql"), os.path.join(workdir, "sql"))
+    code = f"from src.data_gen import generate_data; generate_data.main({os.path.join(workdir, 'data', 'raw')!r})"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True)
+
+def measure(args, cwd, runs):
+    walls, imports = [], []
+    packages = set()
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime"] + args,
+                              cwd=cwd, capture_output=True, text=True)
+        walls.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{args} failed:\n{proc.stderr[-2000:]}")
+        seconds, packages = parse_importtime(proc.stderr)
+        imports.append(seconds)
+    return statistics.median(walls), statistics.median(imports), packages
+
+def main(runs):
+    baseline, _, _ = measure(["-c", "pass"], ROOT, runs)
+    print(f"\n--- Cold start: median of {runs} runs (interpreter alone: {baseline * 1000:.0f} ms) ---")
+    print(f"{'target':<12}{'wall_ms':>10}{'import_ms':>11}  heavy imports")
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare(workdir)
+        for name, args, cwd in targets(workdir):
+            wall, imports, packages = measure(args, cwd, runs)
+            heavy = ", ".join(p for p in HEAVY if p in packages) or "-"
+            print(f"{name:<12}{wall * 1000:>10.0f}{imports * 1000:>11.0f}  {heavy}")
+    if importlib.util.find_spec("streamlit") is None:
+        print("app: streamlit not installed, timed the app module's top-level imports only")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else RUNS)
@@ -0,0 +1,97 @@
+-- Precomputed metrics, written by src.metrics.build
+-- IF NOT EXISTS so the build can run against an existing database;
+-- bump build.METRICS_VERSION when these tables change
+
+-- KPIs (Weekly)
+CREATE TABLE IF NOT EXISTS kpi_weekly (
+    project_id TEXT,
+    week_ending DATE,
+    pv REAL,
+    ev REAL,
+    ac REAL,
+    bac REAL,
+    cpi REAL,
+    spi REAL,
+    eac REAL,
+    vac REAL,
+    tcpi REAL,
+    es REAL,
+    spi_t REAL,
+    sv_t REAL,
+    ieac_t REAL,
+    ieac_t_finish DATE
+);
+CREATE INDEX IF NOT EXISTS idx_kpi_weekly ON kpi_weekly(project_id, week_ending);
+
+-- KPIs (Monthly, month-end snapshots)
+CREATE TABLE IF NOT EXISTS kpi_monthly (
+    project_id TEXT,
+    week_ending DATE,
+    pv REAL,
+    ev REAL,
+    ac REAL,
+    bac REAL,
+    cpi REAL,
+    spi REAL,
+    eac REAL,
+    vac REAL,
+    tcpi REAL,
+    es REAL,
+    spi_t REAL,
+    sv_t REAL,
+    ieac_t REAL,
+    ieac_t_finish DATE
+);
+CREATE INDEX IF NOT EXISTS idx_kpi_monthly ON kpi_monthly(project_id, week_ending);
+
+-- KPIs (Weekly, by WBS)
+CREATE TABLE IF NOT EXISTS kpi_wbs_weekly (
+    project_id TEXT,
+    wbs_id TEXT,
+    week_ending DATE,
+    pv REAL,
+    ev REAL,
+    ac REAL,
+    bac REAL,
+    cpi REAL,
+    spi REAL,
+    eac REAL,
+    vac REAL,
+    tcpi REAL,
+    es REAL,
+    spi_t REAL,
+    sv_t REAL,
+    ieac_t REAL,
+    ieac_t_finish DATE
+);
+CREATE INDEX IF NOT EXISTS idx_kpi_wbs_weekly ON kpi_wbs_weekly(project_id, wbs_id, week_ending);
+
+-- Health Flags
+CREATE TABLE IF NOT EXISTS health_flags (
+    project_id TEXT,
+    week_ending DATE,
+    flag_type TEXT,
+    severity TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_health_flags ON health_flags(project_id, week_ending);
+
+-- EAC / Finish Forecast Ranges (Monte Carlo, latest week)
+CREATE TABLE IF NOT EXISTS eac_forecast (
+    project_id TEXT,
+    week_ending DATE,
+    eac_p10 REAL,
+    eac_p50 REAL,
+    eac_p90 REAL,
+    finish_p10 DATE,
+    finish_p50 DATE,
+    finish_p90 DATE
+);
+CREATE INDEX IF NOT EXISTS idx_eac_forecast ON eac_forecast(project_id);
+
+-- Input fingerprint per project at the time of its last build
+CREATE TABLE IF NOT EXISTS metrics_build_state (
+    project_id TEXT PRIMARY KEY,
+    fingerprint TEXT,
+    built_at TEXT
+);
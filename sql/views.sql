@@ -11,6 +11,20 @@ SELECT
 FROM timephased_cost
 GROUP BY project_id, week_ending;
 
+-- Weekly EV Metrics Aggregated at WBS Level
+DROP VIEW IF EXISTS vw_ev_wbs_weekly;
+CREATE VIEW vw_ev_wbs_weekly AS
+SELECT
+    project_id,
+    wbs_id,
+    week_ending,
+    SUM(pv) as pv,
+    SUM(ev) as ev,
+    SUM(ac) as ac,
+    SUM(bac) as bac
+FROM timephased_cost
+GROUP BY project_id, wbs_id, week_ending;
+
 -- Weekly Schedule Metrics Aggregated at Project Level
 -- Note: 'critical_count' is approximate here, derived from joining back to activities current status if historical status isn't tracked perfectly.
 -- Since we don't have timephased activity status (only pct complete), we'll assume critical path status is static or model it simply.
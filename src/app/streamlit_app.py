@@ -2,49 +2,42 @@
 import streamlit as st
 import pandas as pd
 import sqlite3
-import plotly.express as px
-import plotly.graph_objects as go
 import sys
 import os
+import time
 
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from src.metrics import engine
+from src import schema
+from src.metrics import build, query
+from src.etl import refresh
+
+# plotly and the risk module are imported on the pages that use them, so the
+# first render (Overview) doesn't pay for them
 
 st.set_page_config(page_title="Project Controls Intelligence", layout="wide")
 
 DB_PATH = "data/processed/pc_intel.db"
+RAW_DIR = "data/raw"
 
-# Cloud Deployment Fix: Generate data if DB is missing
-if not os.path.exists(DB_PATH):
-    st.warning("Database not found. Initializing specific synthetic data for demo...")
-    try:
-        # Import data generation and ETL modules locally to avoid circular imports if any
-        # Adjust paths if necessary, but sys.path is already set
-        import sys
-        
-        # Ensure directories exist
-        os.makedirs("data/raw", exist_ok=True)
-        os.makedirs("data/processed", exist_ok=True)
-        
-        # Run Data Generation
-        from src.data_gen import generate_data
-        with st.spinner("Generating synthetic project data..."):
-            generate_data.generate_all()
-            
-        # Run ETL to build DB
-        from src.etl import load_all
-        with st.spinner("Building analytics database..."):
-            load_all.init_db()
-            load_all.process_all()
-            
-        st.success("Initialization complete! Loading dashboard...")
-        st.rerun()
-        
-    except Exception as e:
-        st.error(f"Failed to initialize data: {e}")
+# Background refresh: watches data/raw, rebuilds the DB off the request path and
+# swaps it in atomically. One service per server process.
+@st.cache_resource
+def get_refresh_service():
+    return refresh.RefreshService(DB_PATH, RAW_DIR).start()
+
+refresh_service = get_refresh_service()
+
+# Cloud Deployment Fix: DB is missing (or predates the metrics build), so the
+# service generates synthetic data and/or builds it
+if refresh.db_version(DB_PATH) is None or not build.metrics_ready(DB_PATH):
+    if refresh_service.status == "failed":
+        st.error(f"Failed to initialize data: {refresh_service.last_error}")
         st.stop()
+    st.info("Building the analytics database in the background. The dashboard will load once it is ready...")
+    time.sleep(2)
+    st.rerun()
 
 # Load CSS
 def load_css():
@@ -52,63 +45,64 @@ def load_css():
         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 load_css()
 
-@st.cache_data
-def load_data():
+# Keyed by DB version so a swapped-in DB is picked up on the next rerun;
+# sessions keep the previous cached version until then
+@st.cache_data(max_entries=2)
+def load_data(db_version):
     conn = sqlite3.connect(DB_PATH)
     
-    # Load Weekly Metrics
-    df_metrics_w = engine.get_project_metrics(conn)
-    df_schedule_w = pd.read_sql("SELECT * FROM vw_schedule_weekly", conn)
-    
-    # Load Monthly Metrics
-    df_metrics_m_raw = pd.read_sql("SELECT * FROM vw_ev_monthly", conn)
-    df_metrics_m = engine.calculate_kpis(df_metrics_m_raw) # Recalculate KPIs on monthly snapshots
+    # Flags and forecasts are precomputed by the metrics build (src.metrics.build);
+    # KPIs are read per page through src.metrics.query
+    df_flags = schema.read_sql("SELECT * FROM health_flags ORDER BY project_id, week_ending", conn)
+    df_risk = schema.read_sql("SELECT * FROM eac_forecast", conn)
     
-    df_schedule_m = pd.read_sql("SELECT * FROM vw_schedule_monthly", conn)
+    df_schedule_w = schema.read_sql("SELECT * FROM vw_schedule_weekly", conn)
+    df_schedule_m = schema.read_sql("SELECT * FROM vw_schedule_monthly", conn)
     
     # Load WBS Performance (Monthly) for Treemaps
-    df_wbs_m = pd.read_sql("SELECT * FROM vw_wbs_performance_monthly", conn)
+    df_wbs_m = schema.read_sql("SELECT * FROM vw_wbs_performance_monthly", conn)
     
     # Load Activities for Gantt
-    df_activities = pd.read_sql("SELECT * FROM activities", conn)
+    df_activities = schema.read_sql("SELECT * FROM activities", conn)
     
     # Load Changes
-    df_changes = pd.read_sql("SELECT * FROM changes", conn)
+    df_changes = schema.read_sql("SELECT * FROM changes", conn)
     
     # Load Projects
-    df_projects = pd.read_sql("SELECT * FROM projects", conn)
+    df_projects = schema.read_sql("SELECT * FROM projects", conn)
     
     conn.close()
     
-    # Pre-calculate flags
-    df_flags = engine.generate_flags(df_metrics_w, df_schedule_w, df_changes)
-    
     return {
-        "weekly": {"metrics": df_metrics_w, "schedule": df_schedule_w},
-        "monthly": {"metrics": df_metrics_m, "schedule": df_schedule_m}
-    }, df_changes, df_projects, df_flags, df_activities, df_wbs_m
+        "weekly": {"schedule": df_schedule_w},
+        "monthly": {"schedule": df_schedule_m}
+    }, df_changes, df_projects, df_flags, df_activities, df_wbs_m, df_risk
 
 try:
-    data_dict, df_changes, df_projects, df_flags, df_activities, df_wbs_m = load_data()
+    data_dict, df_changes, df_projects, df_flags, df_activities, df_wbs_m, df_risk = load_data(refresh.db_version(DB_PATH))
 except Exception as e:
     st.error(f"Error loading data: {e}. Did you run 'make build_db'?")
     st.stop()
 
 # Sidebar
 st.sidebar.title("PC Intelligence")
+if refresh_service.status == "building":
+    st.sidebar.caption("Refreshing data in the background...")
+elif refresh_service.status == "failed":
+    st.sidebar.caption(f"Last refresh failed: {refresh_service.last_error}")
 page = st.sidebar.radio("Navigate", ["Overview", "Trends", "Schedule Health", "Changes", "Data Explorer"])
 
 # View Granularity
 view_grain = st.sidebar.radio("View Granularity", ["Monthly", "Weekly"], index=0) # Default to Monthly as requested
 
 # Select Data based on Granularity
-df_metrics = data_dict[view_grain.lower()]["metrics"]
+grain = view_grain.lower()
 df_schedule = data_dict[view_grain.lower()]["schedule"]
 
 # Project Selector (Global or per page? let's do global for context if filtering)
 # Actually, Overview should show all or a summary.
 # Let's add a project filter in sidebar used by Trends/Schedule/Changes.
-project_options = df_projects['project_id'].unique()
+project_options = df_projects['project_id'].unique().tolist()
 selected_project = st.sidebar.selectbox("Select Project", project_options)
 
 st.title("Project Controls Intelligence")
@@ -117,15 +111,15 @@ st.title("Project Controls Intelligence")
 if page == "Overview":
     st.header("Portfolio Overview")
     
-    # Latest Status for all projects
-    latest_dates = df_metrics.groupby('project_id')['week_ending'].max()
+    # Latest Status for all projects (one row per project, selected in SQL)
+    df_latest = query.query_metrics(grain=grain, latest=True, db_path=DB_PATH)
     
     cols = st.columns(len(project_options))
     
     for i, pid in enumerate(project_options):
         # Get latest data
-        last_date = latest_dates[pid]
-        row = df_metrics[(df_metrics['project_id'] == pid) & (df_metrics['week_ending'] == last_date)].iloc[0]
+        row = df_latest[df_latest['project_id'] == pid].iloc[0]
+        last_date = row['week_ending']
         
         with cols[i]:
             st.subheader(f"{pid}")
@@ -135,7 +129,14 @@ if page == "Overview":
             col1.metric("CPI", f"{row['cpi']:.2f}", delta=f"{row['cpi']-1:.2f}")
             col2.metric("SPI", f"{row['spi']:.2f}", delta=f"{row['spi']-1:.2f}")
             
+            st.metric("SPI(t)", f"{row['spi_t']:.2f}", delta=f"{row['sv_t']:.1f} wks")
             st.metric("EAC", f"${row['eac']:,.0f}")
+            p_risk = df_risk[df_risk['project_id'] == pid]
+            if not p_risk.empty:
+                r = p_risk.iloc[0]
+                st.caption(f"EAC P10–P90: ${r['eac_p10']:,.0f} – ${r['eac_p90']:,.0f}")
+                if pd.notna(r['finish_p50']):
+                    st.caption(f"Finish P50: {r['finish_p50']:%Y-%m-%d} (P90 {r['finish_p90']:%Y-%m-%d})")
             st.metric("VAC", f"${row['vac']:,.0f}", delta_color="normal")
             
             # Show active flags
@@ -150,11 +151,14 @@ if page == "Overview":
 # --- Trends ---
 elif page == "Trends":
     st.header(f"Trends Analysis: {selected_project}")
+    import plotly.express as px
+    from src.metrics import risk
     
-    proj_metrics = df_metrics[df_metrics['project_id'] == selected_project]
+    proj_metrics = query.query_metrics([selected_project], grain=grain, db_path=DB_PATH)
     
     # CPI/SPI Chart
-    fig_kpi = px.line(proj_metrics, x='week_ending', y=['cpi', 'spi'], title="CPI & SPI Trends")
+    # SPI(t) is time-based (earned schedule): unlike SPI it doesn't return to 1.0 on a late finish
+    fig_kpi = px.line(proj_metrics, x='week_ending', y=['cpi', 'spi', 'spi_t'], title="CPI, SPI & SPI(t) Trends")
     fig_kpi.add_hline(y=1.0, line_dash="dash", line_color="gray")
     fig_kpi.add_hline(y=0.9, line_dash="dot", line_color="red")
     st.plotly_chart(fig_kpi, use_container_width=True)
@@ -163,6 +167,25 @@ elif page == "Trends":
     fig_ev = px.line(proj_metrics, x='week_ending', y=['ev', 'pv', 'ac'], title="EVM Metrics (Cumulative)")
     st.plotly_chart(fig_ev, use_container_width=True)
     
+    last_row = proj_metrics.iloc[-1]
+    ieac_finish = f"{last_row['ieac_t_finish']:%Y-%m-%d}" if pd.notna(last_row['ieac_t_finish']) else "n/a"
+    st.caption(f"Earned schedule: {last_row['es']:.1f} of {last_row['es'] - last_row['sv_t']:.0f} weeks elapsed, "
+               f"IEAC(t) finish {ieac_finish}")
+    
+    # --- Forecast Ranges (Monte Carlo) ---
+    st.subheader("Forecast Confidence (Monte Carlo)")
+    proj_risk = df_risk[df_risk['project_id'] == selected_project]
+    if not proj_risk.empty:
+        r = proj_risk.iloc[0]
+        st.caption(f"{risk.ITERATIONS:,} simulations resampling weekly CPI and recent EV-rate history, as of {r['week_ending']:%Y-%m-%d}")
+        c1, c2, c3 = st.columns(3)
+        for col, p in zip([c1, c2, c3], risk.PERCENTILES):
+            col.metric(f"EAC P{p}", f"${r[f'eac_p{p}']:,.0f}")
+            finish = r[f'finish_p{p}']
+            col.metric(f"Finish P{p}", f"{finish:%Y-%m-%d}" if pd.notna(finish) else "n/a")
+    else:
+        st.info("No forecast available.")
+    
     # --- Cost Performance Analysis (Treemap) ---
     st.subheader("Cost Performance by WBS (Variance Analysis)")
     
@@ -173,6 +196,7 @@ elif page == "Trends":
     if not proj_wbs.empty:
         last_period = proj_wbs['week_ending'].max()
         current_wbs_data = proj_wbs[proj_wbs['week_ending'] == last_period].copy()
+        current_wbs_data[['project_id', 'wbs_id']] = current_wbs_data[['project_id', 'wbs_id']].astype(str)
         
         # Color by CPI (Efficient vs Inefficient)
         # Avoid div by zero
@@ -186,7 +210,7 @@ elif page == "Trends":
             color_continuous_scale='RdYlGn',
             range_color=[0.8, 1.2],
             # midpoint=1.0, # Removed invalid argument
-            title=f"WBS Budget Distribution & Performance (CPI) - {last_period}"
+            title=f"WBS Budget Distribution & Performance (CPI) - {last_period:%Y-%m-%d}"
         )
         st.plotly_chart(fig_tree, use_container_width=True)
     else:
@@ -201,6 +225,7 @@ elif page == "Trends":
 # --- Schedule Health ---
 elif page == "Schedule Health":
     st.header(f"Schedule Health: {selected_project}")
+    import plotly.express as px
     
     proj_sched = df_schedule[df_schedule['project_id'] == selected_project]
     
@@ -269,12 +294,15 @@ elif page == "Data Explorer":
     
     table_options = {
         "Projects": df_projects,
-        "Metrics (Weekly)": data_dict["weekly"]["metrics"],
-        "Metrics (Monthly)": data_dict["monthly"]["metrics"],
+        # KPI grains are queried on demand (see below)
+        "Metrics (Weekly)": "weekly",
+        "Metrics (Monthly)": "monthly",
+        "Metrics by WBS (Weekly)": "wbs_weekly",
         "Schedule (Weekly)": data_dict["weekly"]["schedule"],
         "Schedule (Monthly)": data_dict["monthly"]["schedule"],
         "Changes": df_changes,
-        "Flags": df_flags
+        "Flags": df_flags,
+        "Forecast Ranges": df_risk
     }
     
     selected_table = st.selectbox("Select Dataset", list(table_options.keys()))
@@ -285,8 +313,12 @@ elif page == "Data Explorer":
     # Usually explorer implies raw access, but let's offer a filter toggle
     df_show = table_options[selected_table]
     
+    if isinstance(df_show, str):
+        # Push the project filter into the query instead of loading every project
+        filter_proj = st.checkbox(f"Filter by Selected Project ({selected_project})", value=True)
+        df_show = query.query_metrics([selected_project] if filter_proj else None, grain=df_show, db_path=DB_PATH)
     # Some tables might not have project_id (though all ours do so far)
-    if 'project_id' in df_show.columns:
+    elif 'project_id' in df_show.columns:
         filter_proj = st.checkbox(f"Filter by Selected Project ({selected_project})", value=True)
         if filter_proj:
             df_show = df_show[df_show['project_id'] == selected_project]
@@ -274,27 +274,29 @@ def generate_changes(projects_df):
              })
     return pd.DataFrame(changes)
 
-def main():
+def main(data_dir=DATA_DIR):
+    os.makedirs(data_dir, exist_ok=True)
+    
     print("Generating Projects...")
     projects = generate_projects()
-    projects.to_csv(f"{DATA_DIR}/projects.csv", index=False)
+    projects.to_csv(f"{data_dir}/projects.csv", index=False)
     
     print("Generating WBS...")
     wbs = generate_wbs(projects["project_id"].unique())
-    wbs.to_csv(f"{DATA_DIR}/wbs.csv", index=False)
+    wbs.to_csv(f"{data_dir}/wbs.csv", index=False)
     
     print("Generating Activities...")
     activities = generate_activities(wbs)
-    activities.to_csv(f"{DATA_DIR}/activities.csv", index=False)
+    activities.to_csv(f"{data_dir}/activities.csv", index=False)
     
     print("Generating Timephased Data...")
     cost, progress = generate_timephased(projects, activities)
-    cost.to_csv(f"{DATA_DIR}/timephased_cost.csv", index=False)
-    progress.to_csv(f"{DATA_DIR}/timephased_progress.csv", index=False)
+    cost.to_csv(f"{data_dir}/timephased_cost.csv", index=False)
+    progress.to_csv(f"{data_dir}/timephased_progress.csv", index=False)
     
     print("Generating Changes...")
     changes = generate_changes(projects)
-    changes.to_csv(f"{DATA_DIR}/changes.csv", index=False)
+    changes.to_csv(f"{data_dir}/changes.csv", index=False)
     
     print("Data generation complete.")
 
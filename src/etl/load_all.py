@@ -1,18 +1,36 @@
 
 import sqlite3
-import pandas as pd
 import os
 import sys
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 DB_PATH = "data/processed/pc_intel.db"
 RAW_DIR = "data/raw"
 SQL_DIR = "sql"
 
-def init_db():
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
+# Load order matters for foreign keys
+FILES_MAP = {
+    "projects.csv": "projects",
+    "wbs.csv": "wbs",
+    "activities.csv": "activities",
+    "timephased_progress.csv": "timephased_progress",
+    "timephased_cost.csv": "timephased_cost",
+    "changes.csv": "changes"
+}
+
+CHUNK_SIZE = 50_000 # rows per parsed chunk
+QUEUE_SIZE = 4 # parsed chunks buffered per file before its parser blocks
+
+_DONE = object()
+
+def init_db(db_path=DB_PATH):
+    if os.path.exists(db_path):
+        os.remove(db_path)
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     with open(f"{SQL_DIR}/schema.sql", 'r') as f:
         conn.executescript(f.read())
     with open(f"{SQL_DIR}/views.sql", 'r') as f:
@@ -20,30 +38,107 @@ def init_db():
     conn.close()
     print("Database initialized.")
 
-def load_data():
-    conn = sqlite3.connect(DB_PATH)
-    
-    files_map = {
-        "projects.csv": "projects",
-        "wbs.csv": "wbs",
-        "activities.csv": "activities",
-        "timephased_progress.csv": "timephased_progress",
-        "timephased_cost.csv": "timephased_cost",
-        "changes.csv": "changes"
-    }
-    
-    for filename, table_name in files_map.items():
-        file_path = os.path.join(RAW_DIR, filename)
+class _Stage:
+    def __init__(self):
+        self.rows = 0
+        self.seconds = 0.0
+
+    def report(self, label):
+        rate = self.rows / self.seconds if self.seconds > 0 else 0.0
+        print(f"{label}: {self.rows:,} rows in {self.seconds:.2f}s ({rate:,.0f} rows/s)")
+
+def _parse_file(file_path, out, stage, cancel):
+    """
+    Parser worker: pushes coerced chunks onto `out`, blocking while it is full.
+    """
+    # Deferred so init_db and the refresh watcher (which reads FILES_MAP) start without pandas
+    import pandas as pd
+    from src import schema
+    try:
+        # Full-width dtypes so every chunk of a table agrees and stored values are unchanged
+        reader = pd.read_csv(file_path, dtype=schema.STORAGE_DTYPES, chunksize=CHUNK_SIZE)
+        while True:
+            start = time.perf_counter()
+            chunk = next(reader, None)
+            stage.seconds += time.perf_counter() - start
+            if chunk is None:
+                break
+            stage.rows += len(chunk)
+            if not _put(out, chunk, cancel):
+                return
+        _put(out, _DONE, cancel)
+    except Exception as e:
+        _put(out, e, cancel)
+
+def _put(out, item, cancel):
+    while not cancel.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def load_data(db_path=DB_PATH, raw_dir=RAW_DIR, workers=None):
+    """
+    Parses all CSVs concurrently in a thread pool while a single writer drains
+    them into SQLite. Each file gets its own bounded queue (backpressure) and
+    the writer consumes them in FILES_MAP order, so foreign-key parents are
+    always written first.
+    """
+    present = {}
+    for filename, table_name in FILES_MAP.items():
+        file_path = os.path.join(raw_dir, filename)
         if os.path.exists(file_path):
-            print(f"Loading {filename} into {table_name}...")
-            df = pd.read_csv(file_path)
-            df.to_sql(table_name, conn, if_exists='append', index=False)
+            present[filename] = file_path
         else:
             print(f"Warning: {filename} not found.")
     
-    conn.close()
+    queues = {filename: queue.Queue(maxsize=QUEUE_SIZE) for filename in present}
+    parse_stages = {filename: _Stage() for filename in present}
+    write_stages = {filename: _Stage() for filename in present}
+    cancel = threading.Event()
+    
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    # Workers pick up files in submission (= load) order, so the file the
+    # writer is waiting on has always started
+    pool = ThreadPoolExecutor(max_workers=workers or min(len(present), os.cpu_count() or 1) or 1)
+    try:
+        for filename, file_path in present.items():
+            pool.submit(_parse_file, file_path, queues[filename], parse_stages[filename], cancel)
+        
+        for filename in present:
+            table_name = FILES_MAP[filename]
+            print(f"Loading {filename} into {table_name}...")
+            while True:
+                item = queues[filename].get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                start = time.perf_counter()
+                item.to_sql(table_name, conn, if_exists='append', index=False)
+                write_stages[filename].seconds += time.perf_counter() - start
+                write_stages[filename].rows += len(item)
+    finally:
+        cancel.set()
+        pool.shutdown(wait=True)
+        conn.close()
+    
+    for filename in present:
+        parse_stages[filename].report(f"  parse {filename}")
+        write_stages[filename].report(f"  write {filename}")
+    total_rows = sum(stage.rows for stage in write_stages.values())
+    print(f"  total: {total_rows:,} rows in {time.perf_counter() - started:.2f}s wall")
+    
     print("Data loading complete.")
 
 if __name__ == "__main__":
-    init_db()
-    load_data()
+    # python -m src.etl.load_all [db_path [raw_dir]]
+    from src.metrics import build
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    raw_dir = sys.argv[2] if len(sys.argv) > 2 else RAW_DIR
+    init_db(db_path)
+    load_data(db_path, raw_dir)
+    build.build_metrics(db_path)
@@ -0,0 +1,194 @@
+
+import os
+import shutil
+import threading
+import time
+import traceback
+
+from src.etl import load_all
+from src.quality import run_checks
+from src.metrics import build
+
+def snapshot_raw(raw_dir=load_all.RAW_DIR):
+    """
+    (mtime_ns, size) for each expected CSV that exists in raw_dir.
+    """
+    state = {}
+    for filename in load_all.FILES_MAP:
+        path = os.path.join(raw_dir, filename)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        state[filename] = (st.st_mtime_ns, st.st_size)
+    return state
+
+def db_version(db_path=load_all.DB_PATH):
+    """
+    Version token for the live DB (changes on every swap). None if the DB is missing.
+    """
+    try:
+        st = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns
+
+def rebuild(db_path=load_all.DB_PATH, raw_dir=load_all.RAW_DIR, workers=None):
+    """
+    Runs ETL, quality checks and the metrics build into a side file, then
+    atomically swaps it in. Readers keep the previous DB until os.replace;
+    returns False (and keeps the previous DB) if the quality checks fail.
+    Metrics are carried over from the previous DB, so only projects whose
+    inputs changed are recomputed. workers: see build.build_metrics.
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    tmp_path = f"{db_path}.{os.getpid()}.building"
+
+    try:
+        load_all.init_db(tmp_path)
+        load_all.load_data(tmp_path, raw_dir)
+        if not run_checks.run_all_checks(tmp_path):
+            return False
+        previous_db = db_path if db_version(db_path) is not None else None
+        build.build_metrics(tmp_path, previous_db=previous_db, workers=workers)
+        os.replace(tmp_path, db_path)
+        return True
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def rebuild_metrics(db_path=load_all.DB_PATH, workers=None):
+    """
+    Adds precomputed metrics to a DB built before they existed, via a copy
+    swapped in the same way as rebuild().
+    """
+    tmp_path = f"{db_path}.{os.getpid()}.building"
+    try:
+        shutil.copyfile(db_path, tmp_path)
+        build.build_metrics(tmp_path, workers=workers)
+        os.replace(tmp_path, db_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class RefreshService:
+    """
+    Polls raw_dir in a daemon thread and rebuilds the DB off the request path
+    whenever the CSVs change. A change must be stable for one poll before it
+    is picked up, so half-written files are not loaded.
+    workers defaults to 1 so a build inside the app's server process stays in
+    that process; the headless watcher passes None to use a process pool.
+    """
+    def __init__(self, db_path=load_all.DB_PATH, raw_dir=load_all.RAW_DIR, interval=5.0, workers=1):
+        self.db_path = db_path
+        self.raw_dir = raw_dir
+        self.interval = interval
+        self.workers = workers
+
+        self.status = "idle" # idle | building | failed
+        self.last_error = None
+        self.last_built = None
+
+        self._loaded = None # raw snapshot the live DB was built from
+        self._pending = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # An existing DB is current for raw_dir only if no CSV was written after it;
+        # otherwise (e.g. data regenerated while the app was down) the first poll rebuilds
+        version = db_version(db_path)
+        current = snapshot_raw(raw_dir)
+        if version is not None and all(mtime <= version for mtime, _ in current.values()):
+            self._loaded = current
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="pc-intel-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def trigger(self):
+        """Ask for a rebuild on the next poll regardless of file state."""
+        self._loaded = None
+        self._pending = None
+        self._wake.set()
+
+    def poll(self):
+        """
+        One watch step. Returns True if a new DB version was swapped in.
+        """
+        if db_version(self.db_path) is None and not snapshot_raw(self.raw_dir):
+            # Nothing to load from: bootstrap synthetic data
+            from src.data_gen import generate_data
+            generate_data.main(self.raw_dir)
+
+        if db_version(self.db_path) is not None and not build.metrics_ready(self.db_path):
+            self.status = "building"
+            try:
+                rebuild_metrics(self.db_path, workers=self.workers)
+                self.status = "idle"
+            except Exception:
+                # Empty, partial or corrupt DB (e.g. missing input tables): rebuild it from the CSVs below
+                traceback.print_exc()
+                self._loaded = None
+
+        current = snapshot_raw(self.raw_dir)
+        if current == self._loaded and db_version(self.db_path) is not None:
+            self._pending = None
+            return False
+        if self._loaded is not None and current != self._pending:
+            # Changed since last poll: wait until the files settle
+            self._pending = current
+            return False
+
+        self.status = "building"
+        try:
+            ok = rebuild(self.db_path, self.raw_dir, workers=self.workers)
+            error = None if ok else "Data quality checks failed"
+        except Exception as e:
+            ok = False
+            error = f"{e}"
+            traceback.print_exc()
+
+        # A failed build is not retried until the files change again
+        self._loaded = current
+        self._pending = None
+        if not ok:
+            self.status = "failed"
+            self.last_error = error
+            return False
+
+        self.status = "idle"
+        self.last_error = None
+        self.last_built = time.time()
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                self.status = "failed"
+                self.last_error = f"{e}"
+                traceback.print_exc()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+if __name__ == "__main__":
+    service = RefreshService(workers=None)
+    print(f"Watching {service.raw_dir} for changes (Ctrl+C to stop)...")
+    try:
+        while True:
+            if service.poll():
+                print(f"Swapped in new database version {db_version(service.db_path)}.")
+            time.sleep(service.interval)
+    except KeyboardInterrupt:
+        pass
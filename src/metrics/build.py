@@ -0,0 +1,197 @@
+
+import hashlib
+import sqlite3
+import time
+from datetime import datetime
+
+# pandas and the metric modules are imported where outputs are computed, so
+# metrics_ready (polled by the app and the refresh watcher) stays sqlite-only
+
+DB_PATH = "data/processed/pc_intel.db"
+SQL_DIR = "sql"
+
+OUTPUT_TABLES = ["kpi_weekly", "kpi_monthly", "kpi_wbs_weekly", "health_flags", "eac_forecast"]
+
+# Stored as PRAGMA user_version; output tables from another version are dropped and rebuilt
+METRICS_VERSION = 3
+
+# Input tables the outputs depend on, with the key columns that order each project's rows
+FINGERPRINT_TABLES = {
+    "timephased_cost": ["wbs_id", "week_ending"],
+    "timephased_progress": ["activity_id", "week_ending"],
+    "activities": ["activity_id"],
+    "changes": ["change_id", "week_ending"],
+}
+
+def build_settings():
+    """
+    Changing the rules or simulation settings invalidates every project.
+    """
+    from src.metrics import risk
+    from src.metrics.rules import DEFAULT_RULES
+    return repr((DEFAULT_RULES, risk.ITERATIONS, risk.SAMPLE_WEEKS, risk.RATE_WEEKS, risk.PERCENTILES))
+
+def ensure_tables(conn):
+    if conn.execute("PRAGMA user_version").fetchone()[0] != METRICS_VERSION:
+        for table in OUTPUT_TABLES + ["metrics_build_state"]:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+    # Views too, so DBs built before a view was added can still be built
+    with open(f"{SQL_DIR}/views.sql", 'r') as f:
+        conn.executescript(f.read())
+    with open(f"{SQL_DIR}/metrics.sql", 'r') as f:
+        conn.executescript(f.read())
+    conn.execute(f"PRAGMA user_version = {METRICS_VERSION}")
+
+def input_fingerprints(conn):
+    """
+    {project_id: fingerprint}: a hash over every one of the project's rows in
+    the input tables, in key order, so any edited value changes it.
+    """
+    settings = build_settings().encode()
+    digests = {}
+    for table, keys in FINGERPRINT_TABLES.items():
+        order = ", ".join(["project_id"] + keys)
+        for row in conn.execute(f"SELECT project_id, * FROM {table} ORDER BY {order}"):
+            pid = row[0]
+            digest = digests.get(pid)
+            if digest is None:
+                digest = digests[pid] = hashlib.sha1(settings)
+            digest.update(f"{table}{row!r}".encode())
+    return {pid: digest.hexdigest() for pid, digest in digests.items()}
+
+def carry_over(conn, previous_db_path):
+    """
+    Copies outputs and build state from a previous version of the DB, so the
+    next build only recomputes projects whose inputs changed.
+    Returns False (nothing copied) if the previous DB has no usable outputs.
+    """
+    conn.execute("ATTACH DATABASE ? AS prev", (previous_db_path,))
+    try:
+        if conn.execute("PRAGMA prev.user_version").fetchone()[0] != METRICS_VERSION:
+            return False
+        found = conn.execute(
+            "SELECT COUNT(*) FROM prev.sqlite_master WHERE type = 'table' AND name IN ({})".format(
+                ", ".join("?" * (len(OUTPUT_TABLES) + 1))),
+            OUTPUT_TABLES + ["metrics_build_state"],
+        ).fetchone()[0]
+        if found < len(OUTPUT_TABLES) + 1:
+            return False
+        with conn:
+            for table in OUTPUT_TABLES + ["metrics_build_state"]:
+                conn.execute(f"DELETE FROM main.{table}")
+                conn.execute(f"INSERT INTO main.{table} SELECT * FROM prev.{table}")
+        return True
+    except sqlite3.Error as e:
+        print(f"Warning: could not carry over metrics from {previous_db_path}: {e}")
+        return False
+    finally:
+        conn.execute("DETACH DATABASE prev")
+
+def metrics_ready(db_path=DB_PATH):
+    """
+    True if the DB already has the current version of the precomputed output tables.
+    False if it is missing or unreadable (opened read-only, so no empty file is left behind).
+    """
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return False
+    try:
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+    return version == METRICS_VERSION and all(table in names for table in OUTPUT_TABLES)
+
+def _read_projects(query, conn, project_ids):
+    import pandas as pd
+    placeholders = ", ".join("?" * len(project_ids))
+    return pd.read_sql(f"{query} WHERE project_id IN ({placeholders})", conn, params=list(project_ids))
+
+def compute_outputs(conn, project_ids, workers=None):
+    """
+    KPIs, flags and forecasts for the given projects, keyed by output table.
+    workers: processes for the Monte Carlo forecasts (see risk.simulate_eac)
+    """
+    from src.metrics import engine, risk
+    from src.metrics.earned_schedule import calculate_earned_schedule
+    
+    df_metrics_w = engine.calculate_kpis(_read_projects("SELECT * FROM vw_ev_weekly", conn, project_ids))
+    df_metrics_w = calculate_earned_schedule(df_metrics_w)
+    
+    # Earned schedule needs the full weekly series, so month-end rows take it from the weekly result
+    df_metrics_m = engine.calculate_kpis(_read_projects("SELECT * FROM vw_ev_monthly", conn, project_ids))
+    es_cols = ['project_id', 'week_ending', 'es', 'spi_t', 'sv_t', 'ieac_t', 'ieac_t_finish']
+    df_metrics_m = df_metrics_m.merge(df_metrics_w[es_cols], on=['project_id', 'week_ending'], how='left')
+    
+    df_wbs_w = engine.calculate_kpis(_read_projects("SELECT * FROM vw_ev_wbs_weekly", conn, project_ids))
+    df_wbs_w = calculate_earned_schedule(df_wbs_w, group_cols=('project_id', 'wbs_id'))
+    df_schedule_w = _read_projects("SELECT * FROM vw_schedule_weekly", conn, project_ids)
+    df_changes = _read_projects("SELECT * FROM changes", conn, project_ids)
+
+    return {
+        "kpi_weekly": df_metrics_w,
+        "kpi_monthly": df_metrics_m,
+        "kpi_wbs_weekly": df_wbs_w,
+        "health_flags": engine.generate_flags(df_metrics_w, df_schedule_w, df_changes),
+        "eac_forecast": risk.simulate_eac(df_metrics_w, workers=workers),
+    }
+
+def _insert(conn, table, df):
+    # executemany rather than to_sql: to_sql commits, which would split the swap
+    from src import schema
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    placeholders = ", ".join("?" * len(columns))
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+        schema.for_storage(df[columns]).itertuples(index=False, name=None),
+    )
+
+def build_metrics(db_path=DB_PATH, full=False, previous_db=None, workers=None):
+    """
+    Recomputes outputs for projects whose input fingerprint changed (all
+    projects if full=True) and drops outputs for projects that no longer exist.
+    previous_db: seed outputs from an older DB version first (see carry_over).
+    workers: forecast processes; None = one per CPU, 1 = in-process.
+    Returns the list of rebuilt project IDs.
+    """
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        ensure_tables(conn)
+        if previous_db is not None and not full:
+            carry_over(conn, previous_db)
+        current = input_fingerprints(conn)
+        stored = dict(conn.execute("SELECT project_id, fingerprint FROM metrics_build_state").fetchall())
+
+        changed = sorted(pid for pid, fp in current.items() if full or stored.get(pid) != fp)
+        removed = sorted(pid for pid in stored if pid not in current)
+        stale = changed + removed
+
+        outputs = compute_outputs(conn, changed, workers) if changed else {}
+
+        # Swap the affected projects' rows in one transaction
+        with conn:
+            if stale:
+                placeholders = ", ".join("?" * len(stale))
+                for table in OUTPUT_TABLES + ["metrics_build_state"]:
+                    conn.execute(f"DELETE FROM {table} WHERE project_id IN ({placeholders})", stale)
+            for table, df in outputs.items():
+                _insert(conn, table, df)
+            built_at = datetime.now().isoformat(timespec='seconds')
+            conn.executemany(
+                "INSERT INTO metrics_build_state (project_id, fingerprint, built_at) VALUES (?, ?, ?)",
+                [(pid, current[pid], built_at) for pid in changed],
+            )
+    finally:
+        conn.close()
+
+    print(f"Metrics built for {len(changed)} of {len(current)} projects "
+          f"({len(removed)} removed) in {time.perf_counter() - start:.2f}s.")
+    return changed
+
+if __name__ == "__main__":
+    import sys
+    build_metrics(full="--full" in sys.argv)
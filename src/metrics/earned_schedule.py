@@ -0,0 +1,74 @@
+
+import pandas as pd
+import numpy as np
+
+def calculate_earned_schedule(df, group_cols=('project_id',)):
+    """
+    Earned Schedule per row, vectorized over every group at once.
+    Expects cumulative weekly columns: <group_cols>, week_ending, pv, ev
+    Returns a copy sorted by group and week with added columns:
+        es             earned schedule (weeks): time at which cumulative PV equals current EV,
+                       interpolated within the week, capped at the planned duration
+        spi_t          SPI(t) = ES / AT, where AT is weeks elapsed (up to completion)
+        sv_t           SV(t) = ES - AT (weeks, negative = behind)
+        ieac_t         IEAC(t) = planned duration / SPI(t) (weeks)
+        ieac_t_finish  start + IEAC(t), start being one week before the first week_ending
+    Unlike cost-based SPI, SPI(t) does not drift back to 1.0 when a late project finishes.
+    """
+    group_cols = list(group_cols)
+    df = df.sort_values(by=group_cols + ['week_ending']).reset_index(drop=True)
+    n = len(df)
+    if n == 0:
+        return df.assign(es=[], spi_t=[], sv_t=[], ieac_t=[], ieac_t_finish=pd.Series([], dtype='datetime64[ns]'))
+
+    grouped = df.groupby(group_cols, sort=False, observed=True)
+    codes = grouped.ngroup().to_numpy()
+    at = grouped.cumcount().to_numpy() + 1
+
+    # Group segments in the sorted frame
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    lengths = np.diff(np.r_[starts, n])
+    seg_start = np.repeat(starts, lengths)
+    seg_end = seg_start + np.repeat(lengths, lengths)
+
+    # Cumulative PV must be non-decreasing to be searchable
+    pv = grouped['pv'].cummax().to_numpy(dtype=float)
+    pv_max = grouped['pv'].transform('max').to_numpy(dtype=float)
+    ev = np.minimum(df['ev'].to_numpy(dtype=float), pv_max)
+
+    # One sorted key for the whole cube: group code + PV scaled into [0, 0.5]
+    scale = np.where(pv_max > 0, 2 * pv_max, 1.0)
+    key_pv = codes + pv / scale
+    key_ev = codes + ev / scale
+
+    # Last week (global index) whose PV <= EV; before the segment start if EV < first week's PV
+    j = np.searchsorted(key_pv, key_ev, side='right') - 1
+    before = j < seg_start
+    pv_c = np.where(before, 0.0, pv[np.clip(j, 0, n - 1)])
+    whole = np.where(before, 0, j - seg_start + 1)
+
+    nxt = j + 1
+    pv_next = pv[np.clip(nxt, 0, n - 1)]
+    step = pv_next - pv_c
+    interpolate = (nxt < seg_end) & (step > 0)
+    frac = np.divide(ev - pv_c, step, out=np.zeros(n), where=interpolate)
+
+    # Planned duration: first week cumulative PV reaches its final value
+    reached = pd.Series(pv >= pv_max - 1e-9 * scale)
+    planned = reached.groupby(codes).transform('idxmax').to_numpy() - seg_start + 1
+
+    # Actual time stops at the week the work completes
+    done = pd.Series(ev >= pv_max - 1e-9 * scale)
+    done_by_group = done.groupby(codes)
+    finished = done_by_group.transform('any').to_numpy()
+    completed_at = done_by_group.transform('idxmax').to_numpy() - seg_start + 1
+    at = np.where(finished, np.minimum(at, completed_at), at)
+
+    es = np.minimum(whole + frac, planned)
+    spi_t = es / at
+    ieac_t = np.divide(planned, spi_t, out=np.full(n, np.nan), where=spi_t > 0)
+
+    start = pd.to_datetime(grouped['week_ending'].transform('first')) - pd.Timedelta(weeks=1)
+    finish = start + pd.to_timedelta(ieac_t * 7, unit='D')
+
+    return df.assign(es=es, spi_t=spi_t, sv_t=es - at, ieac_t=ieac_t, ieac_t_finish=finish.dt.normalize())
@@ -0,0 +1,151 @@
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from src import schema
+
+DB_PATH = "data/processed/pc_intel.db"
+
+# grain -> (precomputed table, key columns always returned)
+GRAINS = {
+    "weekly": ("kpi_weekly", ["project_id", "week_ending"]),
+    "monthly": ("kpi_monthly", ["project_id", "week_ending"]),
+    "wbs_weekly": ("kpi_wbs_weekly", ["project_id", "wbs_id", "week_ending"]),
+}
+
+class QueryCache:
+    """
+    LRU of query results bounded by total DataFrame memory, with hit/miss counters.
+    Shared by every thread (Streamlit session) in the process.
+    """
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df):
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (df, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+CACHE = QueryCache()
+
+def _db_version(db_path):
+    st = os.stat(db_path)
+    return (st.st_mtime_ns, st.st_size)
+
+def _as_date(value):
+    return None if value is None else pd.Timestamp(value).strftime(schema.DATE_FORMAT)
+
+def _table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+def query_metrics(project_ids=None, start=None, end=None, grain="weekly", metrics=None,
+                  latest=False, months=None, db_path=DB_PATH, cache=CACHE):
+    """
+    Reads precomputed KPIs with the filters pushed down into SQL.
+    project_ids: iterable of IDs (None = all projects)
+    start, end: inclusive week_ending bounds (str/date/Timestamp, None = open)
+    grain: 'weekly', 'monthly' or 'wbs_weekly'
+    metrics: columns to return besides the keys (None = all)
+    latest: only each project's (or WBS's) last week_ending within the range
+    months: iterable of calendar months (1-12) to keep, in any year (None = all)
+    Results are cached by query signature and DB version, so a swapped-in DB
+    never serves stale rows. Returned frames are copies.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain '{grain}' (expected one of {list(GRAINS)})")
+    table, keys = GRAINS[grain]
+
+    project_ids = None if project_ids is None else tuple(sorted(set(project_ids)))
+    metrics = None if metrics is None else tuple(m for m in metrics if m not in keys)
+    months = None if months is None else tuple(sorted(set(int(m) for m in months)))
+    start, end = _as_date(start), _as_date(end)
+
+    signature = (os.path.abspath(db_path), _db_version(db_path), table,
+                 project_ids, start, end, months, metrics, latest)
+    cached = cache.get(signature)
+    if cached is not None:
+        return cached.copy()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        available = _table_columns(conn, table)
+        if not available:
+            raise ValueError(f"{table} not found in {db_path}; run 'make build_metrics'")
+        if metrics is None:
+            columns = available
+        else:
+            unknown = [m for m in metrics if m not in available]
+            if unknown:
+                raise ValueError(f"Unknown metrics for {grain}: {unknown}")
+            columns = keys + list(metrics)
+
+        where, params = [], []
+        if project_ids is not None:
+            where.append(f"project_id IN ({', '.join('?' * len(project_ids))})")
+            params.extend(project_ids)
+        if start is not None:
+            where.append("week_ending >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("week_ending <= ?")
+            params.append(end)
+        if months is not None:
+            where.append(f"CAST(strftime('%m', week_ending) AS INTEGER) IN ({', '.join('?' * len(months))})")
+            params.extend(months)
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+
+        if latest:
+            group_keys = ", ".join(k for k in keys if k != "week_ending")
+            where_sql = (f"{where_sql}{' AND' if where else ' WHERE'} ({group_keys}, week_ending) IN "
+                         f"(SELECT {group_keys}, MAX(week_ending) FROM {table}{where_sql} GROUP BY {group_keys})")
+            params = params * 2
+
+        query = f"SELECT {', '.join(columns)} FROM {table}{where_sql} ORDER BY {', '.join(keys)}"
+        df = schema.read_sql(query, conn, params=params)
+    finally:
+        conn.close()
+
+    cache.put(signature, df)
+    return df.copy()
+
+def cache_info():
+    return CACHE.info()
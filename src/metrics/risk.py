@@ -0,0 +1,138 @@
+
+import os
+import sqlite3
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from src import schema
+
+PERCENTILES = (10, 50, 90)
+ITERATIONS = 100_000
+CHUNK_SIZE = 25_000 # iterations drawn per batch, caps memory at CHUNK_SIZE x SAMPLE_WEEKS
+SAMPLE_WEEKS = 12 # historical weeks resampled to form one future CPI / EV rate
+RATE_WEEKS = 12 # most recent weeks the EV rate is resampled from (a late project's current pace)
+MIN_INDEX = 0.1 # floor for simulated CPI so a stalled sample can't divide by zero
+MIN_RATE = 0.01 # floor for the simulated weekly EV rate, as a share of the average planned rate
+
+def _simulate_group(task):
+    """
+    Runs the simulation for one project/WBS. Module-level so it can be sent to a process pool.
+    task: (d_ev, d_ac, recent_ev, ev, ac, bac, planned_rate, iterations, seed)
+    Returns (eac percentiles, remaining-week percentiles); weeks are NaN when
+    there is neither history nor a plan to estimate them from.
+    """
+    d_ev, d_ac, recent_ev, ev, ac, bac, planned_rate, iterations, seed = task
+    remaining = max(bac - ev, 0.0)
+
+    # Complete, or no history to sample from: point estimate
+    if remaining == 0 or len(d_ev) == 0:
+        cpi = ev / ac if ac > 0 else 1.0
+        eac = ac + remaining / max(cpi, MIN_INDEX)
+        # Not started: the remaining work at the planned rate
+        weeks = remaining / planned_rate if planned_rate > 0 else (0.0 if remaining == 0 else np.nan)
+        return [eac] * len(PERCENTILES), [weeks] * len(PERCENTILES)
+
+    min_rate = MIN_RATE * planned_rate
+
+    rng = np.random.default_rng(seed)
+    eac = np.empty(iterations)
+    weeks = np.empty(iterations, dtype=np.float32)
+
+    for start in range(0, iterations, CHUNK_SIZE):
+        n = min(CHUNK_SIZE, iterations - start)
+        idx = rng.integers(0, len(d_ev), size=(n, SAMPLE_WEEKS))
+        ev_sum = d_ev[idx].sum(axis=1)
+        ac_sum = d_ac[idx].sum(axis=1)
+        cpi = np.divide(ev_sum, ac_sum, out=np.ones(n), where=ac_sum > 0)
+        cpi = np.maximum(cpi, MIN_INDEX)
+
+        # Weekly EV rate from recent weeks only: a late project's pace, not its plan's
+        rate = recent_ev[rng.integers(0, len(recent_ev), size=(n, SAMPLE_WEEKS))].mean(axis=1)
+        rate = np.maximum(rate, min_rate)
+
+        eac[start:start + n] = ac + remaining / cpi
+        # A zero rate (no plan and no progress) leaves the finish unknown
+        weeks[start:start + n] = np.divide(remaining, rate, out=np.full(n, np.nan), where=rate > 0)
+
+    return np.percentile(eac, PERCENTILES).tolist(), np.percentile(weeks, PERCENTILES).tolist()
+
+def _build_tasks(df, group_cols, iterations, seed):
+    df = df.sort_values(by=group_cols + ['week_ending'])
+    grouped = df.groupby(group_cols, sort=False, observed=True)
+
+    # Weekly (incremental) performance from the cumulative series
+    deltas = grouped[['ev', 'ac', 'pv']].diff().fillna(df[['ev', 'ac', 'pv']])
+    df = df.assign(d_ev=deltas['ev'], d_ac=deltas['ac'], d_pv=deltas['pv'])
+
+    keys, tasks = [], []
+    for key, group in df.groupby(group_cols, sort=False, observed=True):
+        key = key if isinstance(key, tuple) else (key,)
+        # Seeded per group key, so a group's result doesn't depend on what else is simulated
+        child = np.random.SeedSequence([seed, zlib.crc32(repr(key).encode())])
+        active = group[(group['d_ac'] > 0) | (group['d_pv'] > 0)]
+        last = group.iloc[-1]
+        # Planned duration: first week cumulative PV reaches its own final value
+        # (as in earned_schedule; PV need not sum to BAC)
+        pv = group['pv'].to_numpy(dtype=float)
+        planned_weeks = int(np.argmax(pv >= pv.max() - 1e-6)) + 1
+        # Average planned rate (0 when there is no plan yet)
+        planned_rate = max(pv.max(), float(last['bac'])) / planned_weeks if pv.max() > 0 else 0.0
+        tasks.append((
+            active['d_ev'].to_numpy(dtype=float),
+            active['d_ac'].to_numpy(dtype=float),
+            group['d_ev'].to_numpy(dtype=float)[-RATE_WEEKS:],
+            float(last['ev']), float(last['ac']), float(last['bac']),
+            planned_rate, iterations, child,
+        ))
+        keys.append(key + (last['week_ending'],))
+    return keys, tasks
+
+def simulate_eac(df, group_cols=('project_id',), iterations=ITERATIONS, seed=0, workers=None):
+    """
+    Monte Carlo EAC and finish-date ranges per group (project, or project + WBS).
+    Expects cumulative weekly columns: <group_cols>, week_ending, pv, ev, ac, bac.
+    Each iteration resamples SAMPLE_WEEKS historical weeks to get a future CPI,
+    and SAMPLE_WEEKS of the last RATE_WEEKS weeks to get a future weekly EV rate:
+        EAC = AC + (BAC - EV) / CPI
+        remaining weeks = (BAC - EV) / EV rate
+    Results are reproducible for a given seed regardless of `workers` or of
+    which other groups are in `df`.
+    workers=1 runs in-process; otherwise groups are spread over a process pool.
+    """
+    group_cols = list(group_cols)
+    keys, tasks = _build_tasks(df, group_cols, iterations, seed)
+
+    if workers == 1 or len(tasks) <= 1:
+        results = list(map(_simulate_group, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_group, tasks))
+
+    rows = []
+    for key, (eac_p, weeks_p) in zip(keys, results):
+        row = dict(zip(group_cols + ['week_ending'], key))
+        last_week = pd.Timestamp(row['week_ending'])
+        for p, eac, weeks in zip(PERCENTILES, eac_p, weeks_p):
+            row[f'eac_p{p}'] = eac
+            # NaN weeks: finish unknown (stored as NULL)
+            row[f'finish_p{p}'] = None if np.isnan(weeks) else (last_week + pd.Timedelta(days=7 * float(weeks))).strftime('%Y-%m-%d')
+        rows.append(row)
+
+    columns = group_cols + ['week_ending'] + [f'eac_p{p}' for p in PERCENTILES] + [f'finish_p{p}' for p in PERCENTILES]
+    return schema.compact(pd.DataFrame(rows, columns=columns))
+
+if __name__ == "__main__":
+    conn = sqlite3.connect("data/processed/pc_intel.db")
+    df_project = pd.read_sql("SELECT * FROM vw_ev_weekly", conn)
+    df_wbs = pd.read_sql("SELECT * FROM vw_ev_wbs_weekly", conn)
+    conn.close()
+
+    pd.set_option('display.width', 1000)
+    pd.set_option('display.max_columns', None)
+    print("\n--- Project EAC / Finish Ranges ---")
+    print(simulate_eac(df_project, workers=os.cpu_count()))
+    print("\n--- WBS EAC / Finish Ranges ---")
+    print(simulate_eac(df_wbs, group_cols=('project_id', 'wbs_id'), workers=os.cpu_count()))
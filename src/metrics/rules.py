@@ -0,0 +1,204 @@
+
+import operator
+import string
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+FLAG_COLUMNS = ['project_id', 'week_ending', 'flag_type', 'severity', 'message']
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# threshold: compare the column as-is
+# rolling:   compare the rolling mean over `window` rows (per project)
+# delta:     compare (current - value `window` rows back) per project, clamped to the first row
+RULE_KINDS = ('threshold', 'rolling', 'delta')
+
+@dataclass(frozen=True)
+class HealthRule:
+    """
+    Declarative health rule.
+    The message template is formatted with the row's columns plus
+    `value` (the evaluated expression), `threshold` and `window`.
+    """
+    name: str
+    column: str
+    op: str
+    threshold: float
+    kind: str = 'threshold'
+    window: int = 1
+    flag_type: str = None
+    severity: str = 'High'
+    message: str = '{column} {value:.2f} {op} {threshold:g}'
+
+DEFAULT_RULES = [
+    HealthRule(name='cpi_low', column='cpi', op='<', threshold=0.9,
+               flag_type='Cost Efficiency', severity='High',
+               message='CPI {cpi:.2f} < {threshold:g}'),
+    HealthRule(name='spi_low', column='spi', op='<', threshold=0.9,
+               flag_type='Schedule Efficiency', severity='High',
+               message='SPI {spi:.2f} < {threshold:g}'),
+    # Float Collapse: avg float dropped by > 5 days over 4 weeks
+    HealthRule(name='float_collapse', column='avg_float', op='<', threshold=-5,
+               kind='delta', window=4,
+               flag_type='Float Collapse', severity='Medium',
+               message='Avg Float dropped > 5 days in {window} weeks'),
+]
+
+def rules_from_dicts(specs):
+    """
+    Builds rules from plain dicts (e.g. parsed from a client's YAML/JSON rule file).
+    """
+    return [HealthRule(**spec) for spec in specs]
+
+class CompiledRule:
+    """
+    A rule validated and reduced to a column expression, evaluated over a whole
+    (project_id, week_ending)-sorted frame at once.
+    """
+    def __init__(self, rule):
+        if rule.kind not in RULE_KINDS:
+            raise ValueError(f"Rule '{rule.name}': unknown kind '{rule.kind}' (expected one of {RULE_KINDS})")
+        if rule.op not in OPERATORS:
+            raise ValueError(f"Rule '{rule.name}': unknown operator '{rule.op}'")
+        if rule.window < 1:
+            raise ValueError(f"Rule '{rule.name}': window must be >= 1")
+
+        self.rule = rule
+        self.flag_type = rule.flag_type or rule.name
+        self.compare = OPERATORS[rule.op]
+        self.constants = {'threshold': rule.threshold, 'window': rule.window, 'column': rule.column, 'op': rule.op}
+        # Template as (literal, field, spec, conversion) pieces; constants are formatted once here
+        self.pieces = []
+        for literal, field, spec, conversion in string.Formatter().parse(rule.message):
+            if field in self.constants:
+                literal += self._format(self.constants[field], spec, conversion)
+                field = None
+            self.pieces.append((literal, field, spec, conversion))
+        # Only the fields referenced by the template are pulled out of the frame
+        self.fields = sorted({
+            field.split('.')[0].split('[')[0]
+            for _, field, _, _ in self.pieces
+            if field
+        })
+        self.row_fields = [f for f in self.fields if f != 'value']
+        # Attribute/index lookups ({x.y}, {x[0]}) and nested specs fall back to formatting row by row
+        self.simple = all((field is None or field.isidentifier()) and '{' not in (spec or '')
+                          for _, field, spec, _ in string.Formatter().parse(rule.message))
+
+    @staticmethod
+    def _format(value, spec, conversion):
+        if conversion == 'r':
+            value = repr(value)
+        elif conversion == 's':
+            value = str(value)
+        elif conversion == 'a':
+            value = ascii(value)
+        return format(value, spec or '')
+
+    def expression(self, frame, groups):
+        rule = self.rule
+        col = frame[rule.column]
+        if rule.kind == 'threshold':
+            return col
+        if rule.kind == 'rolling':
+            # Per-project rolling mean; windows that are incomplete or touch a NaN stay NaN
+            return groups[rule.column].rolling(rule.window).mean().reset_index(level=0, drop=True).reindex(frame.index)
+        pos = groups.cumcount()
+        # delta
+        lagged = groups[rule.column].shift(rule.window)
+        lagged = lagged.where(pos >= rule.window, groups[rule.column].transform('first'))
+        return col - lagged
+
+    def mask(self, frame, groups):
+        """
+        (boolean hit mask, evaluated expression) over the whole frame.
+        """
+        values = self.expression(frame, groups)
+        mask = self.compare(values, self.rule.threshold).fillna(False).to_numpy(dtype=bool)
+        return mask, values
+
+    def messages(self, hits, hit_values):
+        """
+        Message per hit, built one template piece at a time over whole columns.
+        """
+        n = len(hits)
+        if not self.simple:
+            names = self.row_fields
+            rows = zip(*(hits[name].tolist() for name in names)) if names else ((),) * n
+            return [
+                self.rule.message.format(value=val, **self.constants, **dict(zip(names, row)))
+                for val, row in zip(hit_values.tolist(), rows)
+            ]
+
+        out = np.full(n, '', dtype=object)
+        for literal, field, spec, conversion in self.pieces:
+            if literal:
+                out = out + literal
+            if field is None:
+                continue
+            column = hit_values if field == 'value' else hits[field]
+            values = column.tolist()
+            if not spec and not conversion and all(type(v) is str for v in values):
+                out = out + np.asarray(values, dtype=object)
+            else:
+                out = out + np.asarray([self._format(v, spec, conversion) for v in values], dtype=object)
+        return out.tolist()
+
+    def evaluate(self, frame, groups, timings=None):
+        """
+        Flags for every row the rule hits. timings (optional dict) receives the
+        seconds spent on the mask ('mask') and on building messages ('format').
+        """
+        rule = self.rule
+        start = time.perf_counter()
+        mask, values = self.mask(frame, groups)
+        hits = frame.loc[mask, ['project_id', 'week_ending'] + [f for f in self.row_fields if f not in ('project_id', 'week_ending')]]
+        hit_values = values[mask]
+        masked = time.perf_counter()
+
+        flags = hits[['project_id', 'week_ending']].reset_index(drop=True)
+        flags['flag_type'] = self.flag_type
+        flags['severity'] = rule.severity
+        flags['message'] = self.messages(hits, hit_values)
+
+        if timings is not None:
+            timings['mask'] = masked - start
+            timings['format'] = time.perf_counter() - masked
+        return flags
+
+def compile_rules(rules):
+    return [CompiledRule(rule) for rule in rules]
+
+def evaluate_rules(merged, compiled):
+    """
+    Evaluates compiled rules over a merged metrics/schedule frame in one pass.
+    Returns (flags DataFrame, {rule name: {'mask': seconds, 'format': seconds}}).
+    """
+    frame = merged.sort_values(by=['project_id', 'week_ending'], kind='stable').reset_index(drop=True)
+    groups = frame.groupby('project_id', sort=False, observed=True)
+
+    results = []
+    timings = {}
+    for rule in compiled:
+        timings[rule.rule.name] = {}
+        results.append(rule.evaluate(frame, groups, timings[rule.rule.name]))
+
+    if not results:
+        return pd.DataFrame(columns=FLAG_COLUMNS), timings
+
+    flags = pd.concat(results, ignore_index=True)
+    # Keep the (project, week, rule order) ordering of the original row-by-row engine
+    flags = flags.sort_values(by=['project_id', 'week_ending'], kind='stable').reset_index(drop=True)
+    return flags, timings
+
+DEFAULT_COMPILED = compile_rules(DEFAULT_RULES)
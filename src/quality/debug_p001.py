@@ -1,19 +1,10 @@
 
-import sqlite3
 import pandas as pd
-from src.metrics.engine import calculate_kpis
+from src.metrics.query import query_metrics
 
 def debug_p001():
-    conn = sqlite3.connect("data/processed/pc_intel.db")
-    df = pd.read_sql("SELECT * FROM vw_ev_weekly WHERE project_id='P001'", conn)
-    conn.close()
-    
-    df = calculate_kpis(df)
-    
-    # Filter for Sept-Dec (Weeks 35-52 approx, and 87-104)
-    # Actually just string match the date
-    df['month'] = df['week_ending'].str[5:7]
-    df_q4 = df[df['month'].isin(['09', '10', '11', '12'])]
+    # Sept-Dec of every year (Weeks 35-52 approx, and 87-104), filtered in SQL
+    df_q4 = query_metrics(["P001"], months=[9, 10, 11, 12], metrics=['pv', 'ev', 'ac', 'cpi', 'spi'])
     
     pd.set_option('display.max_columns', None)
     pd.set_option('display.width', 1000)
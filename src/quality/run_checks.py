@@ -1,5 +1,4 @@
 
-import pandas as pd
 import sqlite3
 
 class QualityCheckException(Exception):
@@ -39,18 +38,24 @@ def check_start_finish_dates(conn):
     print("PASS: Activity dates valid.")
 
 def run_all_checks(db_path):
+    """
+    Returns True if every check passed.
+    """
     conn = sqlite3.connect(db_path)
     try:
         check_negative_values(conn)
         check_percent_complete(conn)
         check_start_finish_dates(conn)
         print("All data quality checks passed.")
+        return True
     except QualityCheckException as e:
         print(f"QUALITY CHECK FAILED: {e}")
         # sys.exit(1) # Optional: fail the build
+        return False
     finally:
         conn.close()
 
 if __name__ == "__main__":
     import sys
-    run_all_checks("data/processed/pc_intel.db")
+    # python -m src.quality.run_checks [db_path]
+    run_all_checks(sys.argv[1] if len(sys.argv) > 1 else "data/processed/pc_intel.db")
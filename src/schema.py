@@ -0,0 +1,96 @@
+
+"""
+Shared in-memory dtypes for every DataFrame the app, engine and generator hold.
+
+- IDs and low-cardinality labels -> category
+- Dates -> datetime64
+- Ratios, percents, float days -> float32 (well inside float32's ~7 significant digits)
+- Currency stays float64: portfolio-sized sums lose cents in float32
+- Counts and durations -> int32
+
+compact() is applied where frames are loaded or produced; for_storage()
+reverses it for anything written back to SQLite/CSV, where dates are
+'YYYY-MM-DD' text. STORAGE_DTYPES is the same registry at full width, for
+parsing raw CSVs without changing the stored values.
+"""
+import pandas as pd
+import numpy as np
+
+CATEGORY_COLUMNS = [
+    "project_id", "wbs_id", "activity_id", "change_id",
+    "client", "wbs_path", "activity_type", "constraint_type",
+    "change_type", "reason", "flag_type", "severity",
+]
+
+DATE_COLUMNS = [
+    "week_ending", "start_date", "finish_date",
+    "start", "finish", "baseline_start", "baseline_finish",
+    "finish_p10", "finish_p50", "finish_p90", "ieac_t_finish",
+]
+
+FLOAT32_COLUMNS = [
+    "cpi", "spi", "tcpi", "es", "spi_t", "sv_t", "ieac_t",
+    "planned_pct", "actual_pct", "planned_pct_total", "actual_pct_total",
+    "avg_float",
+]
+
+INT32_COLUMNS = [
+    "original_duration", "total_float", "critical_count", "constraint_count",
+    "delta_finish_days",
+]
+
+# Not narrowed by compact(), listed so STORAGE_DTYPES covers every raw column
+TEXT_COLUMNS = ["name"]
+BOOL_COLUMNS = ["is_critical"]
+CURRENCY_COLUMNS = ["bac", "pv", "ev", "ac", "delta_bac"]
+
+# Parse-time dtypes for raw CSVs: labels and dates as text, numbers at full width
+STORAGE_DTYPES = {
+    **{col: str for col in CATEGORY_COLUMNS + DATE_COLUMNS + TEXT_COLUMNS},
+    **{col: "float64" for col in FLOAT32_COLUMNS + CURRENCY_COLUMNS},
+    **{col: "int64" for col in INT32_COLUMNS},
+    **{col: bool for col in BOOL_COLUMNS},
+}
+
+DATE_FORMAT = "%Y-%m-%d"
+
+def compact(df):
+    """
+    Converts known columns of df to their compact dtype. Unknown columns are left alone.
+    Returns a new DataFrame.
+    """
+    conversions = {}
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORY_COLUMNS:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                conversions[col] = series.astype("category")
+        elif col in DATE_COLUMNS:
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                conversions[col] = pd.to_datetime(series, format="ISO8601")
+        elif col in FLOAT32_COLUMNS:
+            conversions[col] = series.astype(np.float32)
+        elif col in INT32_COLUMNS:
+            # Nullable when the column has gaps (e.g. left joins)
+            conversions[col] = series.astype("Int32" if series.isna().any() else np.int32)
+    return df.assign(**conversions) if conversions else df
+
+def for_storage(df):
+    """
+    Inverse of compact for writing: dates to 'YYYY-MM-DD' text, categories and
+    nullable ints to plain values (missing -> None).
+    """
+    conversions = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            conversions[col] = series.dt.strftime(DATE_FORMAT).astype(object).where(series.notna(), None)
+        elif isinstance(series.dtype, pd.CategoricalDtype) or isinstance(series.dtype, pd.Int32Dtype):
+            conversions[col] = series.astype(object).where(series.notna(), None)
+    return df.assign(**conversions) if conversions else df
+
+def read_sql(query, conn, params=None):
+    return compact(pd.read_sql(query, conn, params=params))
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 2**20
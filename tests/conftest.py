@@ -0,0 +1,16 @@
+
+import pytest
+from src.data_gen import generate_data
+from src.etl import load_all
+
+@pytest.fixture
+def db_path(tmp_path):
+    """
+    Generated data loaded into tmp_path/pc_intel.db (raw CSVs in tmp_path/raw), metrics not built.
+    """
+    raw_dir = str(tmp_path / "raw")
+    db_path = str(tmp_path / "pc_intel.db")
+    generate_data.main(raw_dir)
+    load_all.init_db(db_path)
+    load_all.load_data(db_path, raw_dir)
+    return db_path
@@ -0,0 +1,55 @@
+
+import sqlite3
+import pandas as pd
+from src.etl import load_all
+from src.metrics import build
+
+def test_build_is_incremental(db_path):
+    assert build.build_metrics(db_path) == ['P001', 'P002', 'P003']
+    assert build.build_metrics(db_path) == []
+    
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE timephased_cost SET ac = ac * 1.5 WHERE project_id = 'P002'")
+    conn.commit()
+    before = pd.read_sql("SELECT * FROM kpi_weekly WHERE project_id = 'P002' ORDER BY week_ending", conn)
+    conn.close()
+    
+    assert build.build_metrics(db_path) == ['P002']
+    
+    conn = sqlite3.connect(db_path)
+    after = pd.read_sql("SELECT * FROM kpi_weekly WHERE project_id = 'P002' ORDER BY week_ending", conn)
+    counts = dict(conn.execute("SELECT project_id, COUNT(*) FROM kpi_weekly GROUP BY project_id").fetchall())
+    conn.close()
+    
+    assert len(after) == len(before)
+    assert (after['cpi'] < before['cpi']).any()
+    assert counts['P001'] == counts['P002'] == counts['P003']
+
+def test_carry_over_from_previous_db(db_path, tmp_path):
+    build.build_metrics(db_path)
+    
+    # Same inputs in a fresh DB: outputs are copied, nothing is recomputed
+    new_path = str(tmp_path / "next.db")
+    load_all.init_db(new_path)
+    load_all.load_data(new_path, str(tmp_path / "raw"))
+    assert build.build_metrics(new_path, previous_db=db_path) == []
+    assert build.metrics_ready(new_path)
+    
+    conn = sqlite3.connect(new_path)
+    assert conn.execute("SELECT COUNT(*) FROM kpi_weekly").fetchone()[0] > 0
+    conn.close()
+
+def test_rebuilds_when_values_move_between_rows(db_path):
+    build.build_metrics(db_path)
+    
+    # Same count and totals per project, different values
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT rowid FROM timephased_cost WHERE project_id = 'P001' AND ac > 50000 ORDER BY rowid LIMIT 2"
+    ).fetchall()
+    conn.execute("UPDATE timephased_cost SET ac = ac - 50000 WHERE rowid = ?", rows[0])
+    conn.execute("UPDATE timephased_cost SET ac = ac + 50000 WHERE rowid = ?", rows[1])
+    conn.commit()
+    conn.close()
+    
+    assert build.build_metrics(db_path) == ['P001']
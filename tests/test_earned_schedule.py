@@ -0,0 +1,34 @@
+
+import pandas as pd
+from src.metrics.earned_schedule import calculate_earned_schedule
+
+def make_weekly():
+    weeks = ['2024-01-07', '2024-01-14', '2024-01-21', '2024-01-28']
+    return pd.DataFrame({
+        'project_id': ['P001'] * 4 + ['P002'] * 4,
+        'week_ending': weeks * 2,
+        'pv': [100.0, 200.0, 300.0, 400.0, 100.0, 200.0, 200.0, 200.0],
+        'ev': [100.0, 150.0, 200.0, 250.0, 50.0, 100.0, 150.0, 200.0],
+    })
+
+def test_earned_schedule_interpolates():
+    result = calculate_earned_schedule(make_weekly())
+    p1 = result[result['project_id'] == 'P001'].reset_index(drop=True)
+    
+    # Week 4: EV 250 sits halfway between PV(2) = 200 and PV(3) = 300
+    assert list(p1['es']) == [1.0, 1.5, 2.0, 2.5]
+    assert p1.iloc[3]['spi_t'] == 0.625
+    assert p1.iloc[3]['sv_t'] == -1.5
+    # IEAC(t) = 4 planned weeks / 0.625
+    assert p1.iloc[3]['ieac_t'] == 6.4
+    assert p1.iloc[3]['ieac_t_finish'] == pd.Timestamp('2024-02-13')
+
+def test_late_finish_not_hidden():
+    result = calculate_earned_schedule(make_weekly())
+    p2 = result[result['project_id'] == 'P002'].reset_index(drop=True)
+    
+    # Finished (EV = PV = BAC) in week 4 against a 2-week plan: cost SPI is back to 1.0
+    assert p2.iloc[0]['es'] == 0.5
+    assert p2.iloc[3]['es'] == 2.0
+    assert p2.iloc[3]['spi_t'] == 0.5
+    assert p2.iloc[3]['sv_t'] == -2.0
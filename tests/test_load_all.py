@@ -0,0 +1,40 @@
+
+import sqlite3
+import pandas as pd
+from src.data_gen import generate_data
+from src.etl import load_all
+
+def test_pipelined_load_matches_csvs(tmp_path, monkeypatch):
+    raw_dir = str(tmp_path / "raw")
+    db_path = str(tmp_path / "pc_intel.db")
+    generate_data.main(raw_dir)
+    
+    # Tiny chunks and queues so parsers block on the writer
+    monkeypatch.setattr(load_all, "CHUNK_SIZE", 100)
+    monkeypatch.setattr(load_all, "QUEUE_SIZE", 1)
+    load_all.init_db(db_path)
+    load_all.load_data(db_path, raw_dir, workers=2)
+    
+    conn = sqlite3.connect(db_path)
+    for filename, table_name in load_all.FILES_MAP.items():
+        expected = pd.read_csv(f"{raw_dir}/{filename}")
+        loaded = pd.read_sql(f"SELECT * FROM {table_name}", conn)
+        assert len(loaded) == len(expected)
+        assert set(loaded.columns) == set(expected.columns)
+    conn.close()
+
+def test_stored_values_keep_full_precision(tmp_path):
+    raw_dir = str(tmp_path / "raw")
+    db_path = str(tmp_path / "pc_intel.db")
+    generate_data.main(raw_dir)
+    load_all.init_db(db_path)
+    load_all.load_data(db_path, raw_dir)
+    
+    # The compact (float32) layer is for in-memory frames only
+    csv = pd.read_csv(f"{raw_dir}/timephased_progress.csv")
+    assert (csv['actual_pct'].astype('float32').astype(str) != csv['actual_pct'].astype(str)).any()
+    
+    conn = sqlite3.connect(db_path)
+    loaded = pd.read_sql("SELECT actual_pct FROM timephased_progress", conn)
+    conn.close()
+    assert loaded['actual_pct'].tolist() == csv['actual_pct'].tolist()
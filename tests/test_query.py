@@ -0,0 +1,72 @@
+
+import os
+import sqlite3
+import pandas as pd
+import pytest
+from src.metrics import build, query
+
+def test_filters_and_latest(db_path):
+    build.build_metrics(db_path)
+    cache = query.QueryCache()
+
+    df = query.query_metrics(["P002"], start="2024-03-01", end="2024-03-31",
+                             metrics=['cpi', 'spi'], db_path=db_path, cache=cache)
+    assert list(df.columns) == ['project_id', 'week_ending', 'cpi', 'spi']
+    assert set(df['project_id']) == {'P002'}
+    assert df['week_ending'].between(pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-31")).all()
+
+    latest = query.query_metrics(db_path=db_path, cache=cache, latest=True)
+    conn = sqlite3.connect(db_path)
+    expected = dict(conn.execute("SELECT project_id, MAX(week_ending) FROM kpi_weekly GROUP BY project_id").fetchall())
+    conn.close()
+    assert len(latest) == len(expected)
+    assert {p: w.strftime("%Y-%m-%d") for p, w in zip(latest['project_id'], latest['week_ending'])} == expected
+
+    q4 = query.query_metrics(["P001"], months=[9, 10, 11, 12], db_path=db_path, cache=cache)
+    assert not q4.empty
+    assert set(q4['week_ending'].dt.month) <= {9, 10, 11, 12}
+    assert q4['week_ending'].dt.year.nunique() > 1
+
+    wbs_latest = query.query_metrics(["P001"], grain="wbs_weekly", latest=True, db_path=db_path, cache=cache)
+    assert not wbs_latest.duplicated(['project_id', 'wbs_id']).any()
+
+    with pytest.raises(ValueError):
+        query.query_metrics(metrics=['nope'], db_path=db_path, cache=cache)
+    with pytest.raises(ValueError):
+        query.query_metrics(grain='daily', db_path=db_path, cache=cache)
+
+def test_cache_hits_and_invalidation(db_path):
+    build.build_metrics(db_path)
+    cache = query.QueryCache()
+
+    first = query.query_metrics(["P001"], db_path=db_path, cache=cache)
+    first['cpi'] = 0.0 # callers get copies, the cached frame is untouched
+    second = query.query_metrics(["P001"], db_path=db_path, cache=cache)
+    assert (second['cpi'] != 0.0).any()
+    assert cache.info()['hits'] == 1 and cache.info()['misses'] == 1
+
+    # A rebuilt DB (new mtime) is a different cache key
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE kpi_weekly SET cpi = 2.0 WHERE project_id = 'P001'")
+    conn.commit()
+    conn.close()
+    st = os.stat(db_path)
+    os.utime(db_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    third = query.query_metrics(["P001"], db_path=db_path, cache=cache)
+    assert (third['cpi'] == 2.0).all()
+    assert cache.info()['misses'] == 2
+
+def test_cache_evicts_by_size():
+    df = pd.DataFrame({'x': range(1000)})
+    size = int(df.memory_usage(deep=True).sum())
+    cache = query.QueryCache(max_bytes=int(size * 2.5))
+
+    cache.put('a', df)
+    cache.put('b', df)
+    assert cache.get('a') is not None # 'a' is now most recently used
+    cache.put('c', df)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.info()['bytes'] <= cache.max_bytes
@@ -0,0 +1,68 @@
+
+import os
+import sqlite3
+from src.data_gen import generate_data
+from src.etl import refresh
+from src.metrics import build
+
+def test_refresh_swaps_in_new_db(tmp_path):
+    raw_dir = str(tmp_path / "raw")
+    db_path = str(tmp_path / "pc_intel.db")
+    
+    # Missing DB: data is generated and the first build happens immediately
+    service = refresh.RefreshService(db_path, raw_dir)
+    assert service.poll()
+    first_version = refresh.db_version(db_path)
+    assert first_version is not None
+    
+    # No change: nothing to do
+    assert not service.poll()
+    
+    # Changed CSV is picked up once it is stable for a poll
+    with open(os.path.join(raw_dir, "changes.csv"), "a") as f:
+        f.write("P001,CHG-999,2024-01-01,Scope Add,100,1,Test\n")
+    assert not service.poll()
+    assert service.poll()
+    assert refresh.db_version(db_path) != first_version
+    
+    conn = sqlite3.connect(db_path)
+    count = conn.execute("SELECT count(*) FROM changes WHERE change_id = 'CHG-999'").fetchone()[0]
+    conn.close()
+    assert count == 1
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".building")]
+    assert build.metrics_ready(db_path)
+
+def test_csvs_changed_while_stopped_are_loaded(tmp_path):
+    raw_dir = str(tmp_path / "raw")
+    db_path = str(tmp_path / "pc_intel.db")
+    assert refresh.RefreshService(db_path, raw_dir).poll()
+    
+    # Edited while no service was running
+    with open(os.path.join(raw_dir, "changes.csv"), "a") as f:
+        f.write("P001,CHG-998,2024-01-01,Scope Add,100,1,Test\n")
+    version = refresh.db_version(db_path)
+    os.utime(os.path.join(raw_dir, "changes.csv"), ns=(version + 1_000_000_000, version + 1_000_000_000))
+    
+    service = refresh.RefreshService(db_path, raw_dir)
+    assert service.poll()
+    assert not service.poll()
+    
+    conn = sqlite3.connect(db_path)
+    count = conn.execute("SELECT count(*) FROM changes WHERE change_id = 'CHG-998'").fetchone()[0]
+    conn.close()
+    assert count == 1
+
+def test_empty_db_is_rebuilt_from_csvs(tmp_path):
+    raw_dir = str(tmp_path / "raw")
+    db_path = str(tmp_path / "pc_intel.db")
+    
+    # Checking a missing DB must not create it
+    assert not build.metrics_ready(db_path)
+    assert refresh.db_version(db_path) is None
+    
+    generate_data.main(raw_dir)
+    open(db_path, "w").close() # e.g. interrupted build
+    service = refresh.RefreshService(db_path, raw_dir)
+    assert service.poll()
+    assert build.metrics_ready(db_path)
+    assert not service.poll()
@@ -0,0 +1,65 @@
+
+import pandas as pd
+from src.metrics.risk import simulate_eac
+
+def make_weekly():
+    weeks = [f"2024-01-{d:02d}" for d in (7, 14, 21, 28)]
+    return pd.DataFrame({
+        'project_id': ['P001'] * 4 + ['P002'] * 4,
+        'week_ending': weeks * 2,
+        'bac': [1000.0] * 8,
+        'pv': [100.0, 200.0, 300.0, 400.0, 250.0, 500.0, 750.0, 1000.0],
+        'ev': [80.0, 170.0, 240.0, 300.0, 250.0, 500.0, 750.0, 1000.0],
+        'ac': [100.0, 190.0, 300.0, 380.0, 240.0, 490.0, 760.0, 990.0],
+    })
+
+def test_simulation_is_reproducible():
+    df = make_weekly()
+    a = simulate_eac(df, iterations=5000, seed=42, workers=1)
+    b = simulate_eac(df, iterations=5000, seed=42, workers=2)
+    pd.testing.assert_frame_equal(a, b)
+
+def test_percentiles_ordered():
+    result = simulate_eac(make_weekly(), iterations=5000, seed=1, workers=1)
+    p1 = result[result['project_id'] == 'P001'].iloc[0]
+    
+    assert p1['eac_p10'] <= p1['eac_p50'] <= p1['eac_p90']
+    assert p1['finish_p10'] <= p1['finish_p50'] <= p1['finish_p90']
+    # Running over budget (CPI < 1): forecast above BAC
+    assert p1['eac_p10'] > 1000.0
+
+def test_complete_project_is_point_estimate():
+    result = simulate_eac(make_weekly(), iterations=5000, seed=1, workers=1)
+    p2 = result[result['project_id'] == 'P002'].iloc[0]
+    
+    assert p2['eac_p10'] == p2['eac_p90'] == 990.0
+    assert p2['finish_p50'] == pd.Timestamp('2024-01-28')
+
+def test_late_project_finish_follows_current_pace():
+    # Planned over 10 weeks (PV stops short of BAC); 30 weeks in, EV creeps at ~1k/week
+    weeks = pd.date_range("2024-01-07", periods=30, freq="7D").strftime("%Y-%m-%d")
+    pv = [min(i + 1, 10) * 9_000.0 for i in range(30)]
+    ev = [6_000.0 * (i + 1) for i in range(10)] + [60_000.0 + 1_000.0 * (i + 1) + (150.0 if i % 2 else 0.0) for i in range(20)]
+    df = pd.DataFrame({
+        'project_id': ['P001'] * 30, 'week_ending': weeks, 'bac': [100_000.0] * 30,
+        'pv': pv, 'ev': ev, 'ac': [e * 1.1 for e in ev],
+    })
+    
+    r = simulate_eac(df, iterations=5000, seed=1, workers=1).iloc[0]
+    
+    # ~20k left at ~1k/week: about 20 weeks out, with a spread
+    weeks_left = (r['finish_p50'] - pd.Timestamp(weeks[-1])).days / 7
+    assert 16 < weeks_left < 24
+    assert r['finish_p10'] < r['finish_p90']
+
+def test_not_started_project_has_no_finish_date():
+    weeks = [f"2024-01-{d:02d}" for d in (7, 14, 21, 28)]
+    df = pd.DataFrame({
+        'project_id': ['P003'] * 4, 'week_ending': weeks, 'bac': [1000.0] * 4,
+        'pv': [0.0] * 4, 'ev': [0.0] * 4, 'ac': [0.0] * 4,
+    })
+    r = simulate_eac(df, iterations=5000, seed=1, workers=1).iloc[0]
+    
+    # Nothing to estimate the pace from: unknown rather than "finishes this week"
+    assert r['eac_p50'] == 1000.0
+    assert pd.isna(r['finish_p10']) and pd.isna(r['finish_p90'])
@@ -0,0 +1,60 @@
+
+import pytest
+import pandas as pd
+from src.metrics.engine import generate_flags
+from src.metrics.rules import HealthRule, compile_rules, evaluate_rules, rules_from_dicts
+
+def make_frames():
+    weeks = ['2024-01-07', '2024-01-14', '2024-01-21', '2024-01-28', '2024-02-04', '2024-02-11']
+    metrics = pd.DataFrame({
+        'project_id': ['P001'] * 6,
+        'week_ending': weeks,
+        'cpi': [1.0, 0.85, 1.0, 1.0, 1.0, 1.0],
+        'spi': [1.0, 1.0, 1.0, 0.8, 1.0, 1.0],
+    })
+    schedule = pd.DataFrame({
+        'project_id': ['P001'] * 6,
+        'week_ending': weeks,
+        'avg_float': [10.0, 10.0, 9.0, 8.0, 10.0, 2.0],
+    })
+    return metrics, schedule
+
+def test_default_rules():
+    metrics, schedule = make_frames()
+    flags = generate_flags(metrics, schedule, None)
+    
+    assert list(flags['flag_type']) == ['Cost Efficiency', 'Schedule Efficiency', 'Float Collapse']
+    assert flags.iloc[0]['message'] == 'CPI 0.85 < 0.9'
+    assert flags.iloc[1]['week_ending'] == pd.Timestamp('2024-01-28')
+    # Float drop from 10 (week 2) to 2 (week 6)
+    assert flags.iloc[2]['week_ending'] == pd.Timestamp('2024-02-11')
+
+def test_custom_rolling_rule():
+    metrics, schedule = make_frames()
+    rules = rules_from_dicts([
+        {'name': 'cpi_trend', 'column': 'cpi', 'op': '<', 'threshold': 0.96,
+         'kind': 'rolling', 'window': 3, 'severity': 'Low',
+         'message': '3-wk CPI avg {value:.2f}'},
+    ])
+    flags, timings = evaluate_rules(pd.merge(metrics, schedule), compile_rules(rules))
+    
+    # Only the windows that include week 2's 0.85 fall below 0.96
+    assert list(flags['week_ending']) == ['2024-01-21', '2024-01-28']
+    assert flags.iloc[0]['message'] == '3-wk CPI avg 0.95'
+    assert flags.iloc[0]['flag_type'] == 'cpi_trend'
+    assert set(timings) == {'cpi_trend'}
+    assert set(timings['cpi_trend']) == {'mask', 'format'}
+
+def test_rolling_mean_at_threshold_is_not_flagged():
+    weeks = pd.date_range('2024-01-07', periods=104, freq='7D')
+    rules = compile_rules([HealthRule(name='cpi_trend', column='cpi', op='<', threshold=threshold,
+                                      kind='rolling', window=3) for threshold in (0.3, 0.7, 0.9, 1.1)])
+    for value in (0.3, 0.7, 0.9, 1.1):
+        frame = pd.DataFrame({'project_id': ['P001'] * 104, 'week_ending': weeks, 'cpi': [value] * 104})
+        flags, _ = evaluate_rules(frame, rules)
+        # Constant CPI: the rolling mean equals its own threshold and is below the higher ones only
+        assert len(flags) == 102 * sum(value < threshold for threshold in (0.3, 0.7, 0.9, 1.1))
+
+def test_invalid_rule():
+    with pytest.raises(ValueError):
+        compile_rules([HealthRule(name='bad', column='cpi', op='~', threshold=1.0)])